@@ -20,7 +20,7 @@ class Bubble:
         nums[i], nums[j] = nums[j], nums[i]
 
     @classmethod
-    def sort(cls, nums: list[int]) -> None: 
+    def sort(cls, nums: list[int], fast: bool=False) -> None: 
         """bubble sort
            Worst case O(N^2) for reverse sorted input
            best case O(N) for sorted input.
@@ -37,7 +37,14 @@ class Bubble:
                             exchange   O(N^2) (N-1) + ... + 1 = N(N-1)/2
                 Best case:  comparison O(N)       1 + ... + 1 = N-1
                             exchange   O(1)       0
+
+        fast: if True, skip this algorithm and sort with the built-in list.sort() (Timsort written in C).
+              recommended for N > 10_000, where it is far faster than this pure-Python version.
         """
+        if fast:
+            nums.sort()
+            return
+
         N = len(nums)
         # O(N) pass from rightend to leftend of array
         # after each pass for i, nums[i..n-1] is sorted
@@ -46,9 +53,8 @@ class Bubble:
             # Step 1 O(N): for unsorted part nums[0..i-1], swap adjacent pairs until nums[i] is max(nums[0..i])
             for j in range(i):
                 if nums[j] > nums[j+1]:
-                    cls.swap(nums, j, j+1)
+                    nums[j], nums[j+1] = nums[j+1], nums[j]   # inlined swap
                     swapped = True
-            assert cls.isSorted(nums, i, N-1)   # nums[i..n-1] is sorted
             # optimization: no swapping means array is sorted, immediately exit 
             if not swapped:
                 break
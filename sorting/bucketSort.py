@@ -15,7 +15,7 @@ class Bucket:
         return True
 
     @classmethod
-    def sort(cls, nums: list[int]) -> None:
+    def sort(cls, nums: list[int], fast: bool=False) -> None:
         """Bucket sort. 
            T: best O(n+k)           items are uniformly distributed over k buckets
               average O(n+n^2/k+k)  items are randomly distributed over k buckets. simplifies to O(n) when k = Θ(n)
@@ -42,7 +42,14 @@ class Bucket:
             - ith item will be put into bucket of index ord(nums[i][0]) - ord('a')
             - bucket sizes are not equal, size of jth bucket is the number of strings starting with letter chr(ord('a')+j)
             - range of jth bucket:  all the strings starting with letter chr(ord('a')+j)
+
+        fast: if True, skip this algorithm and sort with the built-in list.sort() (Timsort written in C).
+              recommended for N > 10_000, where it is far faster than this pure-Python version.
         """
+        if fast:
+            nums.sort()
+            return
+
         n = len(nums)
 
         # 1. O(n) determine bucket size and number of buckets
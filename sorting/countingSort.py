@@ -21,24 +21,36 @@ class Counting:
 
 
     @classmethod
-    def sort(cls, nums: list[int]) -> None:
+    def sort(cls, nums: list[int], fast: bool=False) -> None:
         """Counting sort (stable)
            condition: items are integers with small range
            T: O(N+r)
            S: O(N+r)    an auxiliary array of length N and a counter array of length r
+                        (the counter array is a bytearray when N < 256)
            r is range of array  r = max(nums) - min(nums)
 
            this version of stable counting sort is adapted from Princeton COS226 slide
            https://www.cs.princeton.edu/courses/archive/spr15/cos226/lectures/51StringSorts.pdf
            which consistent with stable radix sort
+
+        fast: if True, skip this algorithm and sort with the built-in list.sort() (Timsort written in C).
+              recommended for N > 10_000, where it is far faster than this pure-Python version.
         """
+        if fast:
+            nums.sort()
+            return
+
         n = len(nums)
 
         # 1. O(n) calculate range of array
         Min, Max = min(nums), max(nums)
         r = Max - Min   # range of array
         indexAt = lambda x: x-Min   # index of integer x, offset x by min so that all values are in the range [0, r-1], can handle negative integers
-        cnt = [0] * (r+2) # initialize a counter array of length r+2
+        # initialize a counter array of length r+2
+        # counts and cumulative counts never exceed n, so for n < 256 a bytearray is enough to hold them,
+        # saving memory only: 1 byte per slot instead of an 8-byte pointer per list slot (small ints are cached)
+        small = n < 256
+        cnt = bytearray(r+2) if small else [0] * (r+2)
         aux = [0] * n  # initialize an auxiliary array of length n 
         
         # 2. O(n) count frequencies of items in array
@@ -46,7 +58,7 @@ class Counting:
             cnt[indexAt(num)+1] += 1
 
         # 3. O(r) calculate cumulative counts (prefix sum array over counter array)
-        cnt = list(accumulate(cnt))
+        cnt = bytearray(accumulate(cnt)) if small else list(accumulate(cnt))
         
         # 4. O(n) output sorted item to auxiliary array
         for num in nums:  
@@ -28,34 +28,43 @@ class Heap:
 
     @classmethod
     def shift_down(cls, nums: list[int], index: int, size: int) -> None:
-        """(recursive) sink the node at index to maintain max-heap invariant
+        """(iterative) sink the node at index to maintain max-heap invariant
            O(logn)  Worst case node will shift-down from root to bottom
 
             if priority of current node < its childen, swap with childen (i.e., shift-down current node to next level).
             Repeat until priority of current node ≥ its children or it is a leaf node.
+
+            the recursion is a tail call, so it is written as a loop.
+            instead of swapping at every level, the sinking node is held in a variable,
+            children of higher priority are moved up one level into the hole,
+            and the node is written once into its final position.
         
         @param 
         nums: max-heap
         index: index of current node  
         size: number of nodes in the heap
         """
-        max_ = index		# node of max priority
-        l = index * 2	    # index of left child node (1-based indexing)
-        r = index * 2 + 1	# index of right child node 
+        # less() and swap() are inlined: indices are "off-by-one" to support 1-based indexing
+        node = nums[index-1]    # node to sink
+        while True:
+            max_ = index * 2    # index of left child node (1-based indexing)
+            if max_ > size:     # current node is a leaf node
+                break 
+
+            # find child of max priority, right child is at index max_+1
+            if max_ < size and nums[max_-1] < nums[max_]:
+                max_ += 1
 
-        # find node of max priority from itself and its two children
-        if l <= size and cls.less(nums, max_, l):  
-            max_ = l                             
-        if r <= size and cls.less(nums, max_, r):  
-            max_ = r                            
+            # stop if priority of current node ≥ its children
+            if not node < nums[max_-1]:
+                break 
 
-        # put node of max priority at top
-        if max_ != index:                        
-            cls.swap(nums, index, max_)             
-            cls.shift_down(nums, max_, size)        # adjust position of current node (index `max_`)
+            nums[index-1] = nums[max_-1]    # move child of max priority up one level
+            index = max_                    # continue from the position of that child
+        nums[index-1] = node
 
     @classmethod
-    def sort(cls, nums: list[int]) -> list[int]:
+    def sort(cls, nums: list[int], fast: bool=False) -> list[int]:
         """Heap sort by a max-heap
             O(NlogN) for all cases
 
@@ -81,7 +90,14 @@ class Heap:
             
             for i in range(N-1, 0, -1):
                 nums[i] = heapq.heappop(nums)
+
+        fast: if True, skip this algorithm and sort with the built-in list.sort() (Timsort written in C).
+              recommended for N > 10_000, where it is far faster than this pure-Python version.
         """
+        if fast:
+            nums.sort()
+            return
+
         size = len(nums)
         # 1. O(N) build a max-heap from array nums
         # proceed from right to left, iterates size//2 times
@@ -91,7 +107,7 @@ class Heap:
         # 2. O(NlogN) sort down.
         while size > 1:       
             # pop root from max-heap, put it at the vacated end of array as the max-heap shrinks
-            cls.swap(nums, 1, size)  # swap root (max node) with last node of max-heap. max node is at its final position
+            nums[0], nums[size-1] = nums[size-1], nums[0]  # swap root (max node) with last node of max-heap. max node is at its final position
             size -= 1             # max node is popped, reduce heap size by one
             cls.shift_down(nums, 1, size)  # O(logN) sink root to maintain max-heap invariant 
 
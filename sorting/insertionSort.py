@@ -5,15 +5,16 @@ insertion sort
 code modified from Java https://www.comp.nus.edu.sg/~stevenha/cs2040/demos/SortingDemo.py and https://algs4.cs.princeton.edu/21elementary/Selection.java.html
 """
 
+from operator import le
 import random
 class Insertion:
     @classmethod
     def isSorted(cls, nums: list[int], lo: int, hi: int) -> bool:
-        """Check if nums[lo..hi] is sorted"""
-        for i in range(lo+1, hi+1):
-            if nums[i] < nums[i-1]:
-                return False 
-        return True
+        """O(n) check if nums[lo..hi] is sorted
+           compares each pair of neighbours nums[i] <= nums[i+1] with map() and all(), 
+           so the whole loop runs in C and stops at the first pair out of order
+        """
+        return all(map(le, nums[lo: hi], nums[lo+1: hi+1]))
 
     @classmethod
     def swap(cls, nums: list[int], i: int, j: int) -> None:
@@ -21,7 +22,7 @@ class Insertion:
         nums[i], nums[j] = nums[j], nums[i]
 
     @classmethod
-    def sort(cls, nums: list[int]) -> None: 
+    def sort(cls, nums: list[int], fast: bool=False) -> None: 
         """insertion sort (insertion by exchange)
 
            Worst case O(N^2) for reverse sorted input
@@ -50,32 +51,54 @@ class Insertion:
 
                 Average case: random array with distinct keys
                             comparison and exchange O(N^2)
+
+        fast: if True, skip this algorithm and sort with the built-in list.sort() (Timsort written in C).
+              recommended for N > 10_000, where it is far faster than this pure-Python version.
         """
+        if fast:
+            nums.sort()
+            return
+
         N = len(nums)
         for i in range(1, N): 
             for j in range(i, 0, -1):
                 if nums[j] < nums[j-1]:
-                    cls.swap(nums, j, j-1)
+                    nums[j], nums[j-1] = nums[j-1], nums[j]   # inlined swap
                 else:
                     break 
-            assert cls.isSorted(nums, 0, i)
         assert cls.isSorted(nums, 0, N-1)
 
 
     @classmethod
-    def sort(cls, nums: list[int]) -> None: 
+    def sort(cls, nums: list[int], fast: bool=False) -> None: 
         """insertion sort (insertion by right shift)
+
+            optimization: sentinel
+            first put the smallest item at nums[0], it stops every inner loop at the latest at j = 0,
+            so the inner loop no longer needs to check the bound j >= 0 on each iteration.
+            The smallest item is moved by exchanging adjacent items from right to left, which keeps the sort stable.
+
+        fast: if True, skip this algorithm and sort with the built-in list.sort() (Timsort written in C).
+              recommended for N > 10_000, where it is far faster than this pure-Python version.
         """
+        if fast:
+            nums.sort()
+            return
+
         N = len(nums)
-        for i in range(1, N): 
+        # O(N) put the smallest item at nums[0] as a sentinel
+        for i in range(N-1, 0, -1):
+            if nums[i] < nums[i-1]:
+                nums[i], nums[i-1] = nums[i-1], nums[i]
+
+        # nums[0..1] is sorted now
+        for i in range(2, N): 
             num = nums[i]     # item to be insert
-            for j in range(i-1, -1, -1):
-                if nums[j] > num:
-                    nums[j+1] = nums[j]
-                else:
-                    nums[j+1] = num  # insert item at j+1
-                    break 
-            assert cls.isSorted(nums, 0, i)
+            j = i - 1
+            while nums[j] > num:    # no bound check, sentinel nums[0] <= num
+                nums[j+1] = nums[j]
+                j -= 1
+            nums[j+1] = num   # insert item at j+1
         assert cls.isSorted(nums, 0, N-1)
 
 
@@ -146,8 +169,6 @@ class Insertion:
             aux: an auxiliary array of length N to store a copy of array nums
         """
         # precondition: nums[lo, mid] and nums[mid+1, hi] are sorted
-        assert cls.isSorted(nums, lo, mid)
-        assert cls.isSorted(nums, mid+1, hi)
 
         # optimization: skip merge if nums[lo, hi] is already sorted
         if mid+1 <= hi and nums[mid] <= nums[mid+1]:
@@ -180,7 +201,6 @@ class Insertion:
         nums[lo: hi+1] = aux[lo: hi+1]
 
         # postcondition: nums[lo, hi] is sorted
-        assert cls.isSorted(nums, lo, hi)
 
         return count 
 
@@ -1,10 +1,22 @@
 """
 merge sort
 2 implementations
-1. top-down recursive (divide-and-conquer)     code modified from https://algs4.cs.princeton.edu/22mergesort/Merge.java.html
+1. top-down (divide-and-conquer)               code modified from https://algs4.cs.princeton.edu/22mergesort/Merge.java.html
+                                               delegates to bottom-up to avoid 2N-1 recursive calls
+   top-down in-place                           merges by rotation like std::inplace_merge (libstdc++ __merge_without_buffer), no auxiliary array
 2. bottom-up iterative                         code modified from https://algs4.cs.princeton.edu/22mergesort/MergeBU.java.html
+                                               merges natural runs of the input, run detection and merge scheduling follow Timsort 
+                                               https://github.com/python/cpython/blob/main/Objects/listsort.txt
 """
+from array import array
+from bisect import bisect_left, bisect_right
+from multiprocessing import Pool
+import heapq
+import os
+
 class MergeSort:
+    MIN_RUN = 32    # natural runs shorter than MIN_RUN are extended to MIN_RUN items by the built-in sorted()
+
     @classmethod
     def isSorted(cls, nums: list[int], lo: int, hi: int) -> bool:
         """check if array[lo..hi] is sorted"""
@@ -13,76 +25,115 @@ class MergeSort:
                 return False 
         return True
 
+    @classmethod
+    def countRun(cls, nums: list[int], lo: int) -> int:
+        """O(n) return the end hi of the natural run starting at lo, nums[lo..hi-1] is the run.
+           a run is a maximal ascending subarray (nums[i] <= nums[i+1]) or strictly descending subarray (nums[i] > nums[i+1]). 
+           a descending run is reversed in place, 
+           it is strictly descending so that reversing it never reorders equal items, keeping the sort stable
+        """
+        n = len(nums)
+        hi = lo + 1
+        if hi == n:
+            return hi
+        
+        hi += 1
+        if nums[lo+1] < nums[lo]:     # strictly descending run
+            while hi < n and nums[hi] < nums[hi-1]:
+                hi += 1
+            nums[lo: hi] = nums[lo: hi][::-1]
+        else:                           # ascending run
+            while hi < n and nums[hi] >= nums[hi-1]:
+                hi += 1
+        return hi
+
     @classmethod
     def merge(cls, nums: list[int], aux: list[int], lo: int, mid: int, hi: int) -> None:
         """O(N) merge two sorted subarrays nums[lo..mid] and nums[mid+1..hi] into a larger sorted array nums[lo..hi]
             N = hi-lo+1
             nums: original array 
-            aux: an auxiliary array of length N to store a copy of array nums
+            aux: an auxiliary array of length N to store a copy of the left subarray nums[lo..mid]
+
+            only the left subarray is copied out: the write pointer never passes the read pointer of the right subarray, 
+            so the right subarray can be merged from where it is.
         """
         # precondition: nums[lo..mid] and nums[mid+1..hi] are sorted
-        assert cls.isSorted(nums, lo, mid)
-        assert cls.isSorted(nums, mid+1, hi)
+        # pre/postconditions are not asserted here, an O(N) isSorted scan per merge costs as much as the merge itself.
+        # bottomup() checks the whole array once at the end.
 
         # optimization: skip merge if nums[lo..hi] is already sorted
-        # then for a sorted input, merge sort takes O(N)
-        if mid+1 <= hi and nums[mid] <= nums[mid+1]:
+        # (right subarray is empty if mid == hi)
+        if mid >= hi or nums[mid] <= nums[mid+1]:
             return
+
+        # optimization (galloping, as in Timsort): skip the items that are already in place
+        # O(logN) binary search for items of the left subarray <= nums[mid+1], they are the smallest, 
+        # and items of the right subarray >= nums[mid], they are the largest. 
+        # only nums[lo..hi] between them needs to be merged.
+        lo = bisect_right(nums, nums[mid+1], lo, mid+1)
+        hi = bisect_left(nums, nums[mid], mid+1, hi+1) - 1
         
-        # 1. O(N) merge two sorted subarrays into an auxiliary array   
-        # nums[lo..mid] + nums[mid+1..hi] -> aux[lo..hi]
-        # 3 pointers, i for aux[lo..hi], l for nums[lo..mid], r for nums[mid+1..hi]
+        # 1. O(N) copy left subarray to auxiliary array
+        aux[lo: mid+1] = nums[lo: mid+1]
+
+        # 2. O(N) merge aux[lo..mid] and nums[mid+1..hi] into nums[lo..hi]
+        # 3 pointers, i for nums[lo..hi], l for aux[lo..mid], r for nums[mid+1..hi]
         i, l, r = lo, lo, mid+1
+        # x, y: current items of left and right subarrays, kept in local variables 
+        # so each item is read only once instead of once per comparison
+        x, y = aux[l], nums[r]
 
-        # when both subarrays are available, add smaller integer to auxiliary array
-        while l <= mid and r <= hi:
-            if nums[l] <= nums[r]:
-                aux[i] = nums[l]
+        # when both subarrays are available, add smaller integer to nums
+        while True:
+            if x <= y:
+                nums[i] = x
+                i += 1
                 l += 1
+                if l > mid:
+                    break
+                x = aux[l]
             else:
-                aux[i] = nums[r]
+                nums[i] = y
+                i += 1
                 r += 1
-            i += 1    
+                if r > hi:
+                    break
+                y = nums[r]
         
-        # when one of subarray is run out, append leftover of another subarray to auxiliary array
+        # when right subarray is run out, append leftover of left subarray
+        # when left subarray is run out, leftover of right subarray is already in place
         if l <= mid:
-            aux[i:hi+1] = nums[l: mid+1]
-        elif r <= hi:
-            aux[i:hi+1] = nums[r: hi+1]
-
-        # 2. O(N) copy auxiliary array back to original array
-        nums[lo: hi+1] = aux[lo: hi+1]
+            nums[i: hi+1] = aux[l: mid+1]
 
         # postcondition: nums[lo..hi] is sorted
-        assert cls.isSorted(nums, lo, hi)
 
     @classmethod
-    def helper(cls, nums: list[int], aux: list[int], lo: int, hi: int) -> None:
-        """O(nlogn) in-place merge sort subarray nums[lo..hi]
-        
-        n = hi-lo+1
+    def mergeAt(cls, nums: list[int], aux: list[int], runs: list[list[int]], i: int) -> None:
+        """merge the ith and i+1th runs on the run stack into one run"""
+        lo, m = runs[i]
+        n = runs[i+1][1]
+        cls.merge(nums, aux, lo, lo+m-1, lo+m+n-1)
+        runs[i][1] = m + n
+        del runs[i+1]
 
-        Base case: n = 0 or 1, then the subarray is already sorted, stop now.
+    @classmethod
+    def sort_array(cls, nums) -> array:
+        """merge sort integers in a typed array, return a sorted array('q') 
+           nums: array.array (sorted in place) or any iterable of integers (copied into a new array('q'))
 
-        subproblem: n >= 2
-        1. divide subarray into two halves, left nums[low..mid] and right nums[mid+1..high]
-            if n is even, len(left) = len(right) = n//2
-            if n is odd,  len(left) = n//2, len(right) = n//2+1
-        2. merge sort the left half.
-        3. merge sort the right half.
-        4. merge the sorted left and right halves into a larger sorted subarray nums[low..high].
+           a list stores a pointer per item to an int object of 28+ bytes, 
+           array('q') stores each item unboxed in 8 bytes, so N items take ~4x less memory, 
+           and the slice copies in merge() become plain memory copies.
+           reading an item still creates an int object, so the comparisons cost about the same as for a list.
         """
-        if lo >= hi:    # base case: subarray only has 0 or 1 item
-            return 
-        
-        mid = (lo + hi) // 2                 # 1. divide subarray into two halves
-        cls.helper(nums, aux, lo, mid)       # 2. merge sort the left half of the subarray.
-        cls.helper(nums, aux, mid+1, hi)     # 3. merge sort the right half of the subarray.
-        cls.merge(nums, aux, lo, mid, hi)    # 4. merge the sorted left and right halves into an subarray.
+        if not isinstance(nums, array):
+            nums = array('q', nums)
+        cls.bottomup(nums)
+        return nums
 
     @classmethod
     def topdown(cls, nums: list[int]) -> None: 
-        """Top-down (recursive) merge sort 
+        """Top-down merge sort 
         O(NlogN) for ALL cases
         Disadvantage: need extra space O(N) to do merge
         
@@ -91,45 +142,186 @@ class MergeSort:
         T(n) is the number of comparisons required to sort an array of length n.
         T(n/2) for left and right halves, n for merge.
         Comparison:   O(NlogN) [1/2 NlogN, NlogN]
-        Array access: O(NlogN) [0, 6 NlogN]
+
+        Top-down recursion:
+        1. divide array into two halves, left nums[lo..mid] and right nums[mid+1..hi]
+        2. merge sort the left half.
+        3. merge sort the right half.
+        4. merge the sorted left and right halves into a larger sorted array nums[lo..hi].
+
+        the recursion makes 2N-1 calls, each one a Python frame, while all the real work is done by merge().
+        bottomup() performs merges of the same O(NlogN) total cost with loops and no recursion,
+        so topdown() delegates to it.
+        """
+        cls.bottomup(nums)
+    
+    @classmethod
+    def reverse(cls, nums: list[int], lo: int, hi: int) -> None:
+        """O(N) reverse nums[lo..hi] in place by swaps, O(1) extra space"""
+        while lo < hi:
+            nums[lo], nums[hi] = nums[hi], nums[lo]
+            lo += 1
+            hi -= 1
+
+    @classmethod
+    def mergeInPlace(cls, nums: list[int], lo: int, mid: int, hi: int) -> None:
+        """O(NlogN) merge two sorted subarrays nums[lo..mid] and nums[mid+1..hi] without an auxiliary array
+            port of __merge_without_buffer from libstdc++ (std::inplace_merge when no buffer can be allocated)
+
+            1. cut the longer subarray in half at cut1 (or cut2), 
+               binary search the cut point cut2 (or cut1) of the other subarray, 
+               so that nums[lo..cut1-1] <= nums[cut1..mid] and nums[mid+1..cut2-1] <= nums[cut2..hi]
+            2. rotate nums[cut1..cut2-1] so that nums[mid+1..cut2-1] comes before nums[cut1..mid]
+            3. merge the two smaller pairs of subarrays on each side of the rotated block
+
+            the longer subarray is halved at every level, so the recursion depth is O(logN).
+            rotation is done by 3 reversals with swaps, O(1) extra space.
+        """
+        while True:
+            # skip merge if nums[lo..hi] is already sorted (or a subarray is empty)
+            if lo > mid or mid >= hi or nums[mid] <= nums[mid+1]:
+                return
+
+            len1, len2 = mid - lo + 1, hi - mid
+            if len1 + len2 == 2:
+                nums[lo], nums[hi] = nums[hi], nums[lo]
+                return
+
+            # 1. cut the longer subarray in half, binary search the cut in the other one
+            # bisect_left on the right and bisect_right on the left keep equal items in order, so the merge is stable
+            if len1 > len2:
+                cut1 = lo + len1 // 2
+                cut2 = bisect_left(nums, nums[cut1], mid+1, hi+1)
+            else:
+                cut2 = mid + 1 + len2 // 2
+                cut1 = bisect_right(nums, nums[cut2], lo, mid+1)
+
+            # 2. rotate nums[cut1..cut2-1]: reverse both blocks, then reverse the whole range
+            cls.reverse(nums, cut1, mid)
+            cls.reverse(nums, mid+1, cut2-1)
+            cls.reverse(nums, cut1, cut2-1)
+            new_mid = cut1 + (cut2 - mid - 1)   # start of the rotated left block
+
+            # 3. recurse on the left pair, loop on the right pair
+            cls.mergeInPlace(nums, lo, cut1-1, new_mid-1)
+            lo, mid = new_mid, cut2-1
+
+    @classmethod
+    def topdown_inplace(cls, nums: list[int], lo: int=0, hi: int=None) -> None:
+        """Top-down merge sort with in-place merge, sorts nums[lo..hi]
+        O(N(logN)^2) comparisons and moves, O(logN) extra space for recursion
+
+        same recursion as topdown(), but merges by rotation with mergeInPlace() instead of copying into an aux array of length N,
+        trading time for memory: use it when N items cannot be allocated twice.
+        subarrays shorter than MIN_RUN are sorted by the built-in sorted(), a temporary copy of at most MIN_RUN items.
+        """
+        if hi is None:
+            hi = len(nums) - 1
+        if hi - lo < cls.MIN_RUN:
+            nums[lo: hi+1] = sorted(nums[lo: hi+1])
+            return
+
+        mid = lo + (hi - lo) // 2
+        cls.topdown_inplace(nums, lo, mid)
+        cls.topdown_inplace(nums, mid+1, hi)
+        cls.mergeInPlace(nums, lo, mid, hi)
+
+    @classmethod
+    def sortChunk(cls, chunk: list[int]) -> list[int]:
+        """merge sort a chunk of array in a worker process of topdown_parallel() and send it back"""
+        cls.bottomup(chunk)
+        return chunk
+
+    @classmethod
+    def topdown_parallel(cls, nums: list[int], processes: int=None) -> None:
+        """Top-down merge sort with the top log(P) levels of recursion done in parallel by P processes
+        the two recursive calls of top-down merge sort work on independent halves, 
+        so the top levels of recursion can be run at the same time on different CPU cores.
+
+        1. divide array into P chunks of almost equal length
+        2. merge sort each chunk in a worker process (multiprocessing.Pool), below the split it is the single-process sort
+        3. O(NlogP) P-way merge of the sorted chunks in the main process by heapq.merge, 
+           ties are taken from the leftmost chunk first, so the sort stays stable
+
+        items are pickled to and from the worker processes, so this only pays off for large N on a machine with several cores,
+        the break-even N has not been measured.
+
+        processes: number of worker processes P, default to os.cpu_count()
         """
         n = len(nums)
-        aux = [0] * n     # O(N) extra space for an auxiliary array
-        cls.helper(nums, aux, 0, n-1)
+        processes = processes or os.cpu_count() or 1
+        if processes < 2 or n < 2 * processes:   # nothing to split, sort in this process
+            cls.bottomup(nums)
+            return
+
+        size = -(-n // processes)   # chunk size ceil(n/P)
+        chunks = [nums[lo: lo+size] for lo in range(0, n, size)]
+        with Pool(processes) as pool:
+            chunks = pool.map(cls.sortChunk, chunks)
+        nums[:] = heapq.merge(*chunks)
 
         assert cls.isSorted(nums, 0, n-1)
     
     @classmethod
     def bottomup(cls, nums: list[int]) -> None: 
-        """Bottom-up (iterative) merge sort.
-        O(NlogN) for ALL cases
+        """Bottom-up (iterative) natural merge sort, merges runs already present in the input like Timsort
+        worst case O(NlogN)
+        best case O(N) input is sorted or reverse sorted, it is a single run
         Disadvantage: need extra space O(N) to do merge
 
-        Comparison:   O(NlogN) [1/2 NlogN, NlogN]   a reverse-sorted array of N = 2^k + 1 distinct keys uses approximately 1/2 NlogN - (k/2 - 1) compares.
-        Array access: O(NlogN) [0, 6 NlogN]
+        Comparison:   O(NlogN) [N-1, NlogN]
 
-        outer loop: O(logN) subarray size of ith iteration = 2^i, 
-                            since subarray size of last iteration= N/2 = 2^(logN-1), 
-                            number of iterations = logN
-        
-        inner loop: O(N)    1. O(N) divide array nums into n//size subarrays 
-                                if n is even, length of all the n//size subarrays is size
-                                if n is odd, length of n//size the subarrays is size, length of the last subarray is size-1
-                            2. O(N) merges size-by-size subarray pairs into a larger subarray of length 2*size
-                                T(merge) * number of pairs = O((2*size) * N//(2*size)) = O(N)
+        1. O(N) scan array from left to right for natural runs (see countRun), descending runs are reversed in place.
+        2. a run shorter than MIN_RUN is extended to MIN_RUN items, sorted by the built-in sorted(). 
+           the small block is sorted by a single call into C instead of log(MIN_RUN) passes of merges or insertions in Python.
+        3. push each run on a stack of runs [lo, length]. 
+           merge adjacent runs while the 3 runs X, Y, Z at top of stack (Z on top) break the invariants
+                len(X) > len(Y) + len(Z) and len(Y) > len(Z)
+           so run lengths grow at least as fast as Fibonacci numbers from top to bottom of stack,
+           the stack holds O(logN) runs and runs of similar length are merged, as the size-by-size merges of the classic version.
+        4. merge the runs left on the stack from top to bottom.
         """
         n = len(nums)
-        aux = [0] * n       # O(N) extra space for an auxiliary array
+        # O(N) extra space for an auxiliary array, of the same kind as nums so that slices can be copied between them
+        is_array = isinstance(nums, array)
+        aux = array(nums.typecode, bytes(nums.itemsize * n)) if is_array else [0] * n
+        runs = []           # stack of runs [lo, length]
+
+        # bind class attributes and builtins to local variables once,
+        # local lookups are cheaper than attribute/global lookups repeated on every run
+        countRun, mergeAt, min_run, _min = cls.countRun, cls.mergeAt, cls.MIN_RUN, min
         
-        # O(NlogN) outer loop: iterates for logN times
-        size = 1          # subarray size start from 1
-        while size < n:
-            # inner loop: O(N) divide and merge size-by-size subarray pairs
-            for lo in range(0, n, 2*size):
-                mid = min(lo + size - 1, n-1)
-                hi = min(lo + 2*size - 1, n-1)
-                cls.merge(nums, aux, lo, mid, hi)      
-            size *= 2     # double the subarray size 
+        lo = 0
+        while lo < n:
+            # 1. find next natural run nums[lo..hi-1]
+            hi = countRun(nums, lo)
+
+            # 2. extend short run to MIN_RUN items
+            if hi - lo < min_run:
+                end = _min(lo + min_run, n)
+                block = sorted(nums[lo: end])
+                nums[lo: end] = array(nums.typecode, block) if is_array else block
+                hi = end
+
+            # 3. push run and merge until invariants hold again
+            runs.append([lo, hi - lo])
+            while len(runs) > 1:
+                i = len(runs) - 2   # Y = runs[i], Z = runs[i+1]
+                if (i > 0 and runs[i-1][1] <= runs[i][1] + runs[i+1][1]) or \
+                   (i > 1 and runs[i-2][1] <= runs[i-1][1] + runs[i][1]):
+                    if runs[i-1][1] < runs[i+1][1]:  # merge X and Y if X is shorter than Z
+                        i -= 1
+                elif runs[i][1] > runs[i+1][1]:   # invariants hold
+                    break
+                mergeAt(nums, aux, runs, i)
+            lo = hi
+
+        # 4. merge all runs left on stack
+        while len(runs) > 1:
+            i = len(runs) - 2
+            if i > 0 and runs[i-1][1] < runs[i+1][1]:
+                i -= 1
+            mergeAt(nums, aux, runs, i)
 
         assert cls.isSorted(nums, 0, n-1)
 
@@ -142,6 +334,14 @@ if __name__ == '__main__':
     print(f"Top-down Merge sort of nums = {nums}")
     MergeSort.topdown(nums)
 
+    nums = [9, 8, 7, 6, 5, 4, 3, 2, 1]
+    print(f"In-place top-down Merge sort of nums = {nums}")
+    MergeSort.topdown_inplace(nums)
+
     nums = [9, 8, 7, 6, 5, 4, 3, 2, 1]
     print(f"Bottom-up Merge sort of nums = {nums}")
-    MergeSort.bottomup(nums)
\ No newline at end of file
+    MergeSort.bottomup(nums)
+
+    nums = [9, 8, 7, 6, 5, 4, 3, 2, 1]
+    print(f"Parallel top-down Merge sort of nums = {nums}")
+    MergeSort.topdown_parallel(nums, processes=2)
\ No newline at end of file
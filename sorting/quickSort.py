@@ -2,12 +2,16 @@
 2-way quick sort and 2-way quick select
 
 partition
-1. two pointers (head and tail)        Code modified from https://leetcode.cn/problems/kth-largest-element-in-an-array/solutions/307351/shu-zu-zhong-de-di-kge-zui-da-yuan-su-by-leetcode-/ and https://algs4.cs.princeton.edu/23quicksort/Quick.java.html
+1. two pointers (head and tail)        (used) Code modified from https://leetcode.cn/problems/kth-largest-element-in-an-array/solutions/307351/shu-zu-zhong-de-di-kge-zui-da-yuan-su-by-leetcode-/ and https://algs4.cs.princeton.edu/23quicksort/Quick.java.html
 2. sliding window                      Code modified from https://www.comp.nus.edu.sg/~stevenha/cs2040/demos/SortingDemo.py
 """
 import random
 
+_rand = random.randint     # module-level alias, saves the attribute lookup on every partition
+
 class Quick:
+    CUTOFF = 32     # subarrays of length <= CUTOFF are sorted by insertion sort instead of partitioning
+
     @classmethod
     def isSorted(cls, nums: list[int], lo: int, hi: int) -> bool:
         """Check if array[lo..hi] is sorted"""
@@ -21,6 +25,36 @@ class Quick:
         """Exchanges nums[i] and nums[j]"""
         nums[i], nums[j] = nums[j], nums[i]
 
+    @classmethod
+    def partition(cls, nums: list[int], lo: int, hi: int, pivot_id: int=None) -> int:
+        """expected O(n) in-place divide subarray nums[lo..hi] into 3 regions
+            implementation 2: sliding window
+            see below for implementation 1 two pointers, which is the one used by helper() and quickSelect()
+            two implementations use different ways to handle the case when key equal to pivot:
+            here each key equal to pivot goes to the left or right half by a coin flip
+        """
+        # 1. choose a pivot
+        if pivot_id is None:   # if pivot_id is not given
+            # pivot_id = lo                              # (normal quick sort) choose the first item to be pivot
+            pivot_id = _rand(lo, hi)  # preferred (Random quick sort) choose an integer in the subarray uniformly at random to be pivot
+        nums[lo], nums[pivot_id] = nums[pivot_id], nums[lo]    # move pivot to the start of the array
+        pivot = nums[lo]
+
+        # 2. divide subarray into 3 regions
+        # i: start of unsolved region
+        # l: end of left half
+        l = lo 
+        for i in range(lo+1, hi+1): 
+            # optimization to avoid TLE O(N^2) on array with duplicates
+            # if nums[i] = pivot, throw a coin, if head: add to left half, if tail: add to right half
+            if nums[i] < pivot or (nums[i] == pivot and random.randrange(2) == 0):
+                l += 1
+                nums[i], nums[l] = nums[l], nums[i]   
+        # put pivot in the middle of 2 halves. pivot is at its final position
+        nums[lo], nums[l] = nums[l], nums[lo]
+        return l
+
+
     @classmethod
     def partition(cls, nums: list[int], lo: int, hi: int, pivot_id: int=None) -> int:
         """expected O(n) in-place divide subarray nums[lo..hi] into 3 regions:
@@ -29,98 +63,107 @@ class Quick:
                 right: nums[mid+1..hi] >= pivot
 
             implementation 1: two pointers (head and tail)
-            see below for implementation2 sliding window
-            two implementations use different ways to handle the case when key equal to pivot
+            both scans stop on keys equal to pivot and swap them, 
+            so duplicates of pivot are spread evenly over the two halves and an array of equal keys is split in the middle.
+            (for many duplicates, 3-way partition in quickSort3way.py puts all keys equal to pivot in their final position at once)
             
             n = hi-lo+1
             
             @param
             lo: lower bound of nums array
             hi: upper bound of nums array
-            pivot_id: index of pivot, default to lo
+            pivot_id: index of pivot, default to median of nums[lo], nums[m], nums[hi], m is a random index in [lo, hi]
             
             return 
             mid: index of pivot at final correct position
 
 
-            sorted input: n+1 compares
-            reverse sorted input: n compares
+            median-of-three pivot (Sedgewick): the median of 3 items is closer to the median of the subarray than a single random item,
+            expected compares drop from ~2NlnN to ~1.7NlnN on random input.
+            the middle sample nums[m] is taken at a random index, not at (lo+hi)//2: 
+            with a fixed sample, an adversarial input (McIlroy's "killer adversary") drives every partition to the worst split, O(N^2).
+            with a random sample, the pivot is at least as good as a random pivot on any input, expected O(NlogN).
         """
         # 1. choose a pivot
         if pivot_id is None:   # if pivot_id is not given
             # pivot_id = lo                              # (normal quick sort) choose the first item to be pivot
-            pivot_id = random.choice(range(lo, hi+1))  # preferred (Random quick sort) randomly choose an integer in the subarray to be pivot
-        cls.swap(nums, lo, pivot_id)    # move pivot to the start of the array
+            # pivot_id = _rand(lo, hi)                   # (Random quick sort) randomly choose an integer in the subarray to be pivot
+            # preferred (randomized median-of-three) sort nums[lo], nums[m], nums[hi] in place so that nums[lo] <= nums[m] <= nums[hi]
+            pivot_id = m = _rand(lo, hi)
+            if nums[m] < nums[lo]:
+                nums[lo], nums[m] = nums[m], nums[lo]
+            if nums[hi] < nums[m]:
+                nums[m], nums[hi] = nums[hi], nums[m]
+                if nums[m] < nums[lo]:
+                    nums[lo], nums[m] = nums[m], nums[lo]
+        nums[lo], nums[pivot_id] = nums[pivot_id], nums[lo]    # move pivot to the start of the array
         pivot = nums[lo]
        
         # 2. divide subarray into 3 regions
         # l: end of left half
         # r: start of right half
-        l, r = lo-1, hi+1
+        l, r = lo, hi+1
 
-        # stop when the scan indices cross
-        while l < r:
-            # (1) (IMPORTANT) increment l and decrement r to avoid TLE O(N^2) on items equal to pivot
-            l += 1      
-            r -= 1
-            # (2) -> left scan: stop on key equal to pivot
-            while nums[l] < pivot:
+        while True:
+            # (1) -> left scan: stop on key >= pivot, or at the end of subarray
+            l += 1
+            while l < hi and nums[l] < pivot:
                 l += 1
-            # (3) <- right scan: stop on key equal to pivot
+            # (2) <- right scan: stop on key <= pivot, stops at the latest at pivot nums[lo]
+            r -= 1
             while nums[r] > pivot:
                 r -= 1
+            # (3) stop when the scan indices cross
+            if l >= r:
+                break
             # (4) swap two items stop the scan, nums[l] >= pivot while nums[r] <= pivot
-            if l < r: 
-                nums[l], nums[r] = nums[r], nums[l]
-        return r  # l >= r
+            nums[l], nums[r] = nums[r], nums[l]
 
+        # put pivot in the middle of 2 halves. pivot is at its final position
+        nums[lo], nums[r] = nums[r], nums[lo]
+        return r
+         
 
     @classmethod
-    def partition(cls, nums: list[int], lo: int, hi: int, pivot_id: int=None) -> int:
-        """expected O(n) in-place divide subarray nums[lo..hi] into 3 regions
-            implementation2  sliding window
+    def insertion(cls, nums: list[int], lo: int, hi: int) -> None:
+        """O(n^2) insertion sort (insertion by right shift) of a small subarray nums[lo..hi]
+           faster than quick sort on tiny subarrays, no partition overhead and items stay in cache
         """
-        # 1. choose a pivot
-        if pivot_id is None:   # if pivot_id is not given
-            # pivot_id = lo                              # (normal quick sort) choose the first item to be pivot
-            pivot_id = random.choice(range(lo, hi+1))  # preferred (Random quick sort) choose an integer in the subarray uniformly at random to be pivot
-        cls.swap(nums, lo, pivot_id)    # move pivot to the start of the array
-        pivot = nums[lo]
-
-        # 2. divide subarray into 3 regions
-        # i: start of unsolved region
-        # l: end of left half
-        l = lo 
-        for i in range(lo+1, hi+1): 
-            # optimization to avoid TLE O(N^2) on array with duplicates
-            # if nums[i] = pivot, throw a coin, if head: add to left half, if tail: add to right half
-            if nums[i] < pivot or (nums[i] == pivot and random.randrange(2) == 0):
-                l += 1
-                cls.swap(nums, i, l)   
-        # put pivot in the middle of 2 halves. pivot is at its final position
-        cls.swap(nums, lo, l)
-        return l
-         
+        for i in range(lo+1, hi+1):
+            num = nums[i]     # item to be insert
+            j = i - 1
+            while j >= lo and nums[j] > num:
+                nums[j+1] = nums[j]
+                j -= 1
+            nums[j+1] = num   # insert item at j+1
 
     @classmethod
     def helper(cls, nums: list[int], lo: int, hi: int) -> None:
         """recursively quick sort subarray nums[low, high]
            
-           base case: n = 0 or 1, subarray is sorted
+           base case: n <= CUTOFF, insertion sort the small subarray
 
-           subproblem: n >= 2
+           subproblem: n > CUTOFF
            1. divide subarray into 3 parts: left half nums[lo..mid-1], pivot nums[mid], right half nums[mid+1..hi]
-           2. quick sort left half nums[lo..mid-1]
-           3. quick sort right half nums[mid+1..hi]
-        """
-        if lo >= hi:   # base case: n = 0 or 1, subarray is sorted
-            return 
+           2. quick sort the smaller half by a recursive call
+           3. quick sort the larger half by looping back to step 1 (tail call elimination)
 
-        mid = cls.partition(nums, lo, hi)   # 1. partition: divide subarray into 3 parts: left half nums[lo..mid-1], pivot nums[mid], right half nums[mid+1..hi]
-        cls.helper(nums, lo, mid-1)         # 2. quick sort left half nums[lo..mid-1]
-        cls.helper(nums, mid+1, hi)         # 3. quick sort right half nums[mid+1..hi]
-        
-        assert cls.isSorted(nums, lo, hi)
+           since the recursive call is always on a half of at most n/2 items, 
+           recursion depth is O(logN) even if partitions are imbalanced, instead of O(N) in the worst case.
+        """
+        # bind class attributes to local variables once, local lookups are cheaper than attribute lookups in the loop
+        partition, helper, cutoff = cls.partition, cls.helper, cls.CUTOFF
+        while hi - lo >= cutoff:
+            mid = partition(nums, lo, hi)       # 1. partition: divide subarray into 3 parts: left half nums[lo..mid-1], pivot nums[mid], right half nums[mid+1..hi]
+            if mid - lo < hi - mid:
+                helper(nums, lo, mid-1)         # 2. quick sort smaller left half nums[lo..mid-1]
+                lo = mid + 1                    # 3. continue with larger right half nums[mid+1..hi]
+            else:
+                helper(nums, mid+1, hi)         # 2. quick sort smaller right half nums[mid+1..hi]
+                hi = mid - 1                    # 3. continue with larger left half nums[lo..mid-1]
+
+        # base case: small subarray, cutoff to insertion sort
+        cls.insertion(nums, lo, hi)
 
     @classmethod
     def sort(cls, nums: list[int]) -> None:
@@ -137,9 +180,12 @@ class Quick:
                                                     partition always splits the array into two halves of almost equal length, like Merge Sort
                                                     e.g., nums = [4, 1, 3, 2, 6, 5, 7] pivot = nums[0] = 4, left half [1,3,2] right half [6,5,7]
             Randomized quick sort: expected O(NlogN) for ALL cases
+            Randomized median-of-three quick sort (used): expected O(NlogN) for ALL cases, ~1.7NlnN compares on random input
+
+        no random.shuffle(nums) before sorting: partition() already samples its pivot at random, 
+        so the shuffle would only add N swaps.
         """
         n = len(nums)
-        random.shuffle(nums)    # randomly shuffle array before sorting, an alternate way is in partition().
         cls.helper(nums, 0, n-1)
         
         assert cls.isSorted(nums, 0, n-1)
@@ -154,19 +200,23 @@ class Quick:
 	       and nums[0, k-1] <= nums[k] <= nums[k+1, n-1]
            
            e.g., call quickSelect with k = (n-1)//2 will make nums[k] be median
-        """
-        # base case: array only has 0 or 1 items, already sorted
-        if lo >= hi:
-            return 
-
-        # 1. 2-way partition nums[lo..hi]
-        mid = cls.partition(nums, lo, hi)
 
-        # 2. recursively quick select left or right half
-        if mid < k:
-            cls.quickSelect(nums, mid+1, hi, k)     # quick select right half
-        else:
-            cls.quickSelect(nums, lo, mid, k)     # quick select left half
+           iterative: the only recursive call is a tail call, so it is written as a loop
+        """
+        partition = cls.partition
+        # stop when subarray only has 0 or 1 items, already sorted
+        while lo < hi:
+            # 1. 2-way partition nums[lo..hi]
+            mid = partition(nums, lo, hi)
+
+            # 2. quick select left or right half
+            # pivot nums[mid] is at its final position, done if mid == k
+            if mid < k:
+                lo = mid + 1    # quick select right half
+            elif mid > k:
+                hi = mid - 1    # quick select left half
+            else:
+                return
 
     @classmethod
     def kthSmallest(cls, nums: list[int], k: int) -> int:
@@ -177,7 +227,7 @@ class Quick:
         Note: kth smallest is not kth smallest distinct
         """
         n = len(nums)
-        cls.quickSelect(nums, k-1, 0, n-1)
+        cls.quickSelect(nums, 0, n-1, k-1)
         return nums[k-1]
     
 
@@ -190,7 +240,7 @@ class Quick:
         Note: kth largest is not kth largest distinct
         """
         n = len(nums)
-        cls.quickSelect(nums, n-k, 0, n-1)
+        cls.quickSelect(nums, 0, n-1, n-k)
         return nums[n-k]
     
 
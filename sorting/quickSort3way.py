@@ -3,9 +3,15 @@
 
 Code modified from Java https://algs4.cs.princeton.edu/23quicksort/Quick3way.java.html
 """
+from multiprocessing import Pool
+import os
 import random
 
+_rand = random.randint     # module-level alias, saves the attribute lookup on every partition
+
 class Quick3way:
+    CUTOFF = 32     # subarrays of length <= CUTOFF are sorted by insertion sort instead of partitioning
+
     @classmethod
     def isSorted(cls, nums: list[int], lo: int, hi: int) -> bool:
         """Check if array[lo..hi] is sorted"""
@@ -22,7 +28,7 @@ class Quick3way:
     @classmethod
     def partition3way(cls, nums: list[int], lo: int, hi: int, pivot_id: int=None) -> tuple[int, int]:
         """expected O(n) 3-way partition
-            in-place divide subarray nums[lo..hi] into 3 regions: 
+            divide subarray nums[lo..hi] into 3 regions: 
                 left: nums[lo..lt-1]  < pivot
                 middle: nums[lt..gt] = pivot  
                 right: nums[gt+1..hi] > pivot
@@ -39,29 +45,46 @@ class Quick3way:
             n = hi-lo 
         """
         # 1. choose a pivot. 
-        if pivot_id == None:
+        if pivot_id is None:
             # pivot_id = lo                              # normal 3-way quick sort
-            pivot_id = random.choice(range(lo, hi+1))  # preferred. randomized 3-way quick sort
-        cls.swap(nums, lo, pivot_id)   # move pivot to the start of the array
+            pivot_id = _rand(lo, hi)                   # preferred. randomized 3-way quick sort, no range object per call
+        nums[lo], nums[pivot_id] = nums[pivot_id], nums[lo]   # move pivot to the start of the array
         pivot = nums[lo]  
         
         # 2. divide subarray[lo..hi] into 3 regions
+
+        # implementation 0 (used): count-based, no swaps
+        # (1) collect items < pivot, items equal to pivot and items > pivot by three list comprehensions, 
+        #     they run without the per-item index arithmetic, 3-way branch and swap of the pointer loops below
+        # (2) write back left, middle and right regions with slice assignments
+        # items equal to pivot are kept as they are, not replaced by copies of pivot: 
+        # they may be distinct objects (e.g., records) that only compare equal
+        # uses O(n) extra space for the three lists, the pointer loops below are in place
+        sub = nums[lo: hi+1]
+        left = [num for num in sub if num < pivot]
+        mid = [num for num in sub if not (num < pivot or num > pivot)]
+        right = [num for num in sub if num > pivot]
+        lt = lo + len(left)
+        gt = lt + len(mid) - 1
+        nums[lo: hi+1] = left + mid + right
+        return lt, gt
+
         # 3 pointers
         # i: start of unsolved region
         # lt, gt: start and end of middle region
 
-        # implementation 1 (preferred)
+        # implementation 1
         # more general and can be adapted to scenario where the pivot is not necessarily at the lo position
         # e.g., leetcode problem 75. Sort Colors
         i = lo  # change here
         lt, gt = lo, hi   
         while i <= gt:
             if nums[i] < pivot:
-                cls.swap(nums, i, lt)
+                nums[i], nums[lt] = nums[lt], nums[i]
                 lt += 1
                 i += 1      # change here
             elif nums[i] > pivot:
-                cls.swap(nums, i, gt)
+                nums[i], nums[gt] = nums[gt], nums[i]
                 gt -= 1
             else:
                 i += 1
@@ -72,10 +95,10 @@ class Quick3way:
         lt, gt = lo, hi   
         while i <= gt:
             if nums[i] < pivot:
-                cls.swap(nums, i, lt)
+                nums[i], nums[lt] = nums[lt], nums[i]
                 lt += 1     # change here
             elif nums[i] > pivot:
-                cls.swap(nums, i, gt)
+                nums[i], nums[gt] = nums[gt], nums[i]
                 gt -= 1
             else:
                 i += 1
@@ -83,27 +106,51 @@ class Quick3way:
     
 
 
+    @classmethod
+    def insertion(cls, nums: list[int], lo: int, hi: int) -> None:
+        """O(n^2) insertion sort (insertion by right shift) of a small subarray nums[lo..hi]
+           faster than 3-way quick sort on tiny subarrays, no partition overhead and items stay in cache
+        """
+        for i in range(lo+1, hi+1):
+            num = nums[i]     # item to be insert
+            j = i - 1
+            while j >= lo and nums[j] > num:
+                nums[j+1] = nums[j]
+                j -= 1
+            nums[j+1] = num   # insert item at j+1
+
     @classmethod
     def helper(cls, nums: list[int], lo: int, hi: int) -> None:
-        """recursively 3-way quick sort subarray nums[lo..hi]
+        """iteratively 3-way quick sort subarray nums[lo..hi] with an explicit stack of subarrays (lo, hi)
            
-           base case: n = 0 or 1, subarray is sorted
+           base case: n <= CUTOFF, insertion sort the small subarray
 
-           subproblem: n >= 2
+           subproblem: n > CUTOFF
            1. 3-way partition: divide subarray nums[lo..hi] into 3 parts: left nums[lo..lt-1], middle nums[lt..gt], right nums[gt+1..hi]
-           2. 3-way quick sort left part nums[lo..lt-1]
-           3. 3-way quick sort right part nums[gt+1..hi]
+           2. push the larger of left and right parts on the stack
+           3. 3-way quick sort the smaller part by looping back to step 1
 
            middle part nums[lt..gt] does not need to be processed further as all its elements are already in their final position.
+
+           the stack replaces recursion: no Python frame per subarray and no RecursionError on deep partitions.
+           since the loop always continues with the smaller part, each stacked part is at least twice as large as the next one,
+           stack depth is O(logN).
         """
-        if lo >= hi:   # base case: n = 0 or 1, subarray is sorted
-            return 
+        partition3way, insertion, cutoff = cls.partition3way, cls.insertion, cls.CUTOFF
+        stack = [(lo, hi)]
+        while stack:
+            lo, hi = stack.pop()
+            while hi - lo >= cutoff:
+                lt, gt = partition3way(nums, lo, hi)   # 1. 3-way partition
+                if lt - lo < hi - gt:
+                    stack.append((gt+1, hi))    # 2. push larger right part nums[gt+1..hi]
+                    hi = lt - 1                 # 3. continue with smaller left part nums[lo..lt-1]
+                else:
+                    stack.append((lo, lt-1))    # 2. push larger left part nums[lo..lt-1]
+                    lo = gt + 1                 # 3. continue with smaller right part nums[gt+1..hi]
 
-        lt, gt = cls.partition3way(nums, lo, hi)   # 1. 3-way partition: divide subarray nums[lo..hi] into 3 parts: left nums[lo..lt-1], middle nums[lt..gt], right nums[gt+1..hi]
-        cls.helper(nums, lo, lt-1)                 # 2. 3-way quick sort left part nums[lo..lt-1]
-        cls.helper(nums, gt+1, hi)                 # 3. 3-way quick sort right part nums[gt+1..hi]
-        
-        assert cls.isSorted(nums, lo, hi)
+            # base case: small subarray, cutoff to insertion sort
+            insertion(nums, lo, hi)
 
     @classmethod
     def sort(cls, nums: list[int]) -> None:
@@ -119,26 +166,81 @@ class Quick3way:
         
         assert cls.isSorted(nums, 0, n-1)
 
+    @classmethod
+    def sortChunk(cls, chunk: list[int]) -> list[int]:
+        """3-way quick sort a subarray in a worker process of sort_parallel() and send it back"""
+        cls.helper(chunk, 0, len(chunk)-1)
+        return chunk
+
+    @classmethod
+    def sort_parallel(cls, nums: list[int], processes: int=None) -> None:
+        """3-way quick sort with independent subarrays sorted in parallel by P processes
+            after a partition, left part nums[lo..lt-1] and right part nums[gt+1..hi] share no items,
+            so they can be sorted at the same time on different CPU cores.
+
+            1. in the main process, repeatedly 3-way partition the largest subarray until there are P subarrays
+            2. 3-way quick sort each subarray in a worker process (multiprocessing.Pool)
+            3. copy the sorted subarrays back to their place, no merge is needed
+
+            threads would not help: the GIL lets only one thread run Python code at a time.
+            items are pickled to and from the worker processes, so this only pays off for large N on a machine with several cores,
+            the break-even N has not been measured.
+
+            processes: number of worker processes P, default to os.cpu_count()
+        """
+        n = len(nums)
+        processes = processes or os.cpu_count() or 1
+        if processes < 2 or n < 2 * processes * cls.CUTOFF:   # nothing to split, sort in this process
+            cls.sort(nums)
+            return
+
+        # 1. split nums into P independent subarrays (lo, hi)
+        parts = [(0, n-1)]
+        while parts and len(parts) < processes:
+            lo, hi = max(parts, key=lambda part: part[1] - part[0])
+            if hi - lo < cls.CUTOFF:    # largest subarray is small, no need to split further
+                break
+            parts.remove((lo, hi))
+            lt, gt = cls.partition3way(nums, lo, hi)
+            parts += [part for part in ((lo, lt-1), (gt+1, hi)) if part[0] < part[1]]
+
+        # 2. sort subarrays in parallel, 3. copy them back
+        with Pool(processes) as pool:
+            chunks = pool.map(cls.sortChunk, [nums[lo: hi+1] for lo, hi in parts])
+        for (lo, hi), chunk in zip(parts, chunks):
+            nums[lo: hi+1] = chunk
+
+        assert cls.isSorted(nums, 0, n-1)
+
     @classmethod
     def quickSelect3way(cls, nums: list[int], lo: int, hi: int, k: int):
         """expected O(n) 3-way quick select
            rearrange nums array such that nums[k] is the k+1th smallest element (not kth distinct smallest)
            and nums[0..k-1] <= nums[k] <= nums[k+1..n-1]
            e.g., call quickSelect with k = (n-1)//2 will make nums[k] be median
+
+           iterative: the only recursive call is a tail call, so it is written as a loop
         """
-        # base case, array has 0 or 1 items, is sorted
-        if lo >= hi:
-            return 
-
-        # 1. 3-way partition nums[lo..hi]
-        lt, gt = cls.partition3way(nums, lo, hi)
-
-        # 2. recursively 3-way quick select left or right half
-        if gt < k:
-            cls.quickSelect3way(nums, gt+1, hi, k)
-        else:
-            cls.quickSelect3way(nums, lo, lt, k)
-            
+        partition3way, cutoff = cls.partition3way, cls.CUTOFF
+        # stop when subarray has 0 or 1 items, is sorted
+        while lo < hi:
+            # base case: small subarray, cutoff to insertion sort, which puts nums[k] at its final position too
+            if hi - lo < cutoff:
+                cls.insertion(nums, lo, hi)
+                return
+
+            # 1. 3-way partition nums[lo..hi]
+            lt, gt = partition3way(nums, lo, hi)
+
+            # 2. 3-way quick select left or right part
+            # keys equal to pivot nums[lt..gt] are at their final position, done if lt <= k <= gt
+            if k < lt:
+                hi = lt - 1     # quick select left part nums[lo..lt-1]
+            elif k > gt:
+                lo = gt + 1     # quick select right part nums[gt+1..hi]
+            else:
+                return
+
 
     @classmethod
     def kthSmallest(cls, nums: list[int], k: int) -> int:
@@ -149,11 +251,11 @@ class Quick3way:
         Note: kth smallest is not kth smallest distinct
         """
         n = len(nums)
-        cls.quickSelect3way(nums, k-1, 0, n-1)
+        cls.quickSelect3way(nums, 0, n-1, k-1)
         return nums[k-1]
 
     @classmethod
-    def findKthLargest(cls, nums: list[int], k: int):
+    def kthLargest(cls, nums: list[int], k: int) -> int:
         """
         O(n) return the kth largest element in array
 
@@ -164,6 +266,8 @@ class Quick3way:
         cls.quickSelect3way(nums, 0, n-1, n-k)
         return nums[n-k]
 
+    findKthLargest = kthLargest     # old name, kept for existing callers
+
 
 if __name__ == '__main__':
     random.seed(123)
@@ -182,6 +286,10 @@ if __name__ == '__main__':
     print(f"best case, input with many duplicates = {nums}")
     Quick3way.sort(nums)
 
+    nums = random.sample(range(1, 10000), 1000)
+    print("Parallel 3-way Quick sort of random input with distinct keys")
+    Quick3way.sort_parallel(nums, processes=2)
+
     #======================================================
     print("3-way Quick select")
 
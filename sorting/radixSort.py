@@ -1,12 +1,13 @@
 """
 radix sort
 - LSD radix sort for integers
+- MSD radix sort for integers, in-place (American flag sort)
 - MSD radix sort for strings
 
 code adapted from Java code https://www.cs.princeton.edu/courses/archive/spr15/cos226/lectures/51StringSorts.pdf
 """
+from collections import Counter
 
-from itertools import accumulate
 
 class lsdRadix:
     @classmethod
@@ -18,42 +19,55 @@ class lsdRadix:
         return True
     
     @classmethod
-    def countingSort(cls, nums: list[int], aux: list[int], exp: int) -> None:
-        """O(n+b) counting sort nums array based on the log(exp)th digit
+    def countingSort(cls, nums: list[int], aux: list[int], shift: int) -> bool:
+        """O(n+b) counting sort nums array based on the digit at bit offset shift, output to aux array
             
             counting sort is chosen as subroutine for sorting individual digit
             because it's stable and efficient for small range O(n+r) here r = b
 
             @param 
             nums: array to be sorted
-            aux: auxiliary array
-            exp: exponential number
+            aux: auxiliary array, receives the sorted items
+            shift: bit offset of the digit, a multiple of 8
+
+            return False if the pass is skipped and aux is untouched, True if sorted items are in aux
 
             Steps
-            1. create 10 buckets (for digit 0-9)
+            1. create 256 buckets (for digit 0-255, i.e., one byte)
             2. for each item in array
-                move item into respective bucket based on log(exp)th digit
+                move item into respective bucket based on the digit at bit offset shift
             3. iterates over buckets from smallest digit to largest digit
                restore items in each bucket to array 
         """
-        b = 10                          # base, 10 for decimal
+        b = 256                         # base, 256 so that a digit is a byte
         cnt = [0] * (b+1)                   # initialize b empty buckets
-        indexAt = lambda x: (x//exp) % b  # function to get logexp th digit of integer x 
+        # O(n) get digit at bit offset shift of every integer once, by a list comprehension instead of a lambda call per item per loop
+        # a shift and a mask instead of a division and a modulo
+        digits = [(num >> shift) & 255 for num in nums]
+
+        # optimization: skip the pass if all items have the same digit, the pass would not move any item
+        # e.g., leading digits of items smaller than an outlier are all 0
+        if digits.count(digits[0]) == len(digits):
+            return False
 
         # 1. O(n) count frequencies of items in nums array
-        for num in nums:        
-            cnt[indexAt(num)+1] += 1
+        # Counter counts the digits in a C loop, only the O(b) distinct digits are copied into cnt in Python
+        for digit, freq in Counter(digits).items():
+            cnt[digit+1] = freq
         
-        # 2. O(b) calculate cumulative count
-        cnt = list(accumulate(cnt))
+        # 2. O(b) calculate cumulative count in place, no new list per pass
+        for j in range(1, b+1):
+            cnt[j] += cnt[j-1]
         
         # 3. O(n) output sorted num to auxiliary array
-        for num in nums:
-            aux[cnt[indexAt(num)]] = num 
-            cnt[indexAt(num)] += 1 
+        # scan nums backward and fill each bucket from its end cnt[digit+1] down (CLRS style), 
+        # the last item of a bucket is placed last, so the sort stays stable
+        for num, digit in zip(reversed(nums), reversed(digits)):
+            cnt[digit+1] -= 1
+            aux[cnt[digit+1]] = num 
 
-        # 4. O(n) copy auxiliary array back to original array
-        nums[:] = aux
+        # auxiliary array is not copied back to original array, the caller swaps the roles of the two arrays
+        return True
 
     @classmethod 
     def sort(cls, nums: list[int]) -> None:
@@ -63,11 +77,13 @@ class lsdRadix:
            order: short keys come before longer keys, and then keys of the same length are sorted lexicographically.
 
            Assumption: d << n << r. input with large range but of few digits. 
-           input types: integers
+           input types: non-negative integers
            
         d: max number of digits of nums[i]
         N: number of items in an array
-        b: base (radix) for representing item, i.e., the number of unique digits, b = 10 for decimal with digit 0-9
+        b: base (radix) for representing item, i.e., the number of unique digits, 
+           b = 256, each digit is a byte with digit 0-255, taken out by a shift and a mask.
+           a 64-bit integer takes 8 passes, instead of up to 20 for decimal b = 10
              
         Steps
         1. padding
@@ -78,24 +94,132 @@ class lsdRadix:
             from least significant digit (LSD) to the most significant digit (MSD)
         """ 
         n = len(nums)
-        aux = [0] * n
+        # ping-pong buffers: each pass reads src and writes dst, then the two arrays swap roles,
+        # instead of copying N items from aux back to nums after every pass
+        src, dst = nums, [0] * n
         Max = max(nums)    # O(n) use max number in array to find max digit size
-        b = 10
-        exp = 1
+        shift = 0
         d = 0           # max digit size in array
 
         # O(d) pass from rightmost digit (LSD) to leftmost digit (MSD)
-        while Max // exp: 
-            # O(n+b) sort array based on log(exp)th digit
-            cls.countingSort(nums, aux, exp)
-            exp *= b
+        while Max >> shift: 
+            # O(n+b) sort array based on digit at bit offset shift
+            if cls.countingSort(src, dst, shift):
+                src, dst = dst, src
+            shift += 8
             d += 1
 
+        # copy back only once, if the sorted items ended up in the auxiliary array
+        if src is not nums:
+            nums[:] = src
+
         assert cls.isSorted(nums, 0, n-1)
         print(f"range = {nums[-1]-nums[0]}, digit size = {d}")
 
 
+class msdRadixInt:
+    CUTOFF = 32     # buckets of length <= CUTOFF are sorted by insertion sort instead of another radix pass
+
+    @classmethod
+    def isSorted(cls, nums: list[int], lo: int, hi: int) -> bool:
+        """Check if nums[lo..hi] is sorted"""
+        for i in range(lo+1, hi+1):
+            if nums[i] < nums[i-1]:
+                return False 
+        return True
+
+    @classmethod
+    def insertion(cls, nums: list[int], lo: int, hi: int) -> None:
+        """O(n^2) insertion sort (insertion by right shift) of a small bucket nums[lo..hi]"""
+        for i in range(lo+1, hi+1):
+            num = nums[i]     # item to be insert
+            j = i - 1
+            while j >= lo and nums[j] > num:
+                nums[j+1] = nums[j]
+                j -= 1
+            nums[j+1] = num   # insert item at j+1
+
+    @classmethod
+    def helper(cls, nums: list[int], lo: int, hi: int, shift: int) -> None:
+        """O(n+b) in-place MSD radix sort of subarray nums[lo..hi] from the byte at bit offset shift
+        n = hi-lo+1
+        shift: bit offset of target byte, from 8(d-1) (most significant byte) down to 0
+
+        Base case: n <= CUTOFF, insertion sort the small bucket.
+
+        subproblem: n > CUTOFF
+        1. O(n) count frequencies of each byte value
+        2. O(b) compute start (head) and end (tail) of each bucket
+        3. O(n) permute items into their buckets in place by cycles:
+           take the item at head of bucket d, swap it into head of the bucket of its byte, 
+           repeat with the item swapped out until an item of bucket d comes back.
+           every swap puts one item into its final bucket, so there are at most n swaps and no auxiliary array
+        4. recursively sort each bucket based on the next byte
+        """
+        if hi - lo < cls.CUTOFF:     # base case: small bucket
+            cls.insertion(nums, lo, hi)
+            return
+
+        b = 256
+        # 1. O(n) count frequencies of bytes
+        cnt = [0] * b
+        for num in nums[lo: hi+1]:
+            cnt[(num >> shift) & 255] += 1
+
+        # 2. O(b) start and end of each bucket nums[heads[d]..tails[d]-1]
+        heads, tails = [0] * b, [0] * b
+        pos = lo
+        for d in range(b):
+            heads[d] = pos
+            pos += cnt[d]
+            tails[d] = pos
+
+        # 3. O(n) permute items into buckets by cycles
+        for d in range(b):
+            while heads[d] < tails[d]:
+                num = nums[heads[d]]
+                digit = (num >> shift) & 255
+                while digit != d:   # num belongs to another bucket, swap it in and pick up the item there
+                    nums[heads[digit]], num = num, nums[heads[digit]]
+                    heads[digit] += 1
+                    digit = (num >> shift) & 255
+                nums[heads[d]] = num
+                heads[d] += 1
+
+        # 4. recursively sort each bucket based on the next byte
+        if shift:
+            for d in range(b):
+                if cnt[d] > 1:
+                    cls.helper(nums, tails[d]-cnt[d], tails[d]-1, shift-8)
+
+    @classmethod 
+    def sort(cls, nums: list[int]) -> None:
+        """in-place MSD Radix sort for non-negative integers (American flag sort)
+           T: O(d(N+b)) S: O(db) for counters and recursion, no auxiliary array of length N
+           not stable, items are moved by swaps
+           
+        d: max number of bytes of nums[i]
+        N: number of items in an array
+        b: base (radix), b = 256 so that each digit is one byte and is taken out by a shift and a mask
+
+        compared to LSD radix sort:
+        1. sorts from the most significant byte, a bucket stops being processed as soon as it is small,
+           instead of all d passes over all N items
+        2. items are permuted in place, instead of being copied into an auxiliary array and back on every pass
+        """ 
+        n = len(nums)
+        if n < 2:
+            return
+        shift = (max(nums).bit_length() - 1) // 8 * 8     # bit offset of the most significant byte
+        cls.helper(nums, 0, n-1, max(shift, 0))
+
+        assert cls.isSorted(nums, 0, n-1)
+
+
 class msdRadix:
+    b = 26          # base for lowercase English letters a-z
+    ZEROS = (0,) * (b+2)    # template to reset a counter array in place
+
     @classmethod
     def isSorted(cls, nums: list[int], lo: int, hi: int) -> bool:
         """Check if nums[lo..hi] is sorted"""
@@ -105,7 +229,7 @@ class msdRadix:
         return True
     
     @classmethod
-    def countingSort(cls, strs: list[str], aux: int, lo: int, hi: int, i: int) -> None:
+    def countingSort(cls, strs: list[str], aux: int, counters: list[list[int]], lo: int, hi: int, i: int) -> list[int]:
         """O(n+b) counting sort strs subarray[lo..hi] based on the ith character
             
             counting sort is chosen as subroutine for sorting individual character
@@ -114,6 +238,7 @@ class msdRadix:
             @param 
             strs: array to be sorted
             aux: auxiliary array
+            counters: one counter array per character index, counters[i] is reused by every call at depth i
             i: index of target character  e.g., i = 0 for 'a' of 'apple'
             
             Steps
@@ -123,21 +248,30 @@ class msdRadix:
             3. iterates over buckets from smallest character to largest character
                restore items in each bucket to array 
         """
-        b = 26              # base for ASCII characters
-        cnt = [0] * (b+2)    # initialize a counter array of length b+2, cnt[1] for character out of range
-        indexAt = lambda s: ord(s[i])-ord('a') if i < len(s) else -1  # function to get ith character of string s
+        b = cls.b
+        # reset the counter array of length b+2 of depth i, cnt[1] for character out of range
+        # it is reused instead of allocating a new list on every call, 
+        # it is safe: while helper() reads counters[i] between its recursive calls, those calls only use counters[i+1..d]
+        cnt = counters[i]
+        cnt[:] = cls.ZEROS
+        sub = strs[lo: hi+1]
+        # O(n) get ith character of every string once, by a list comprehension instead of a lambda call per item per loop
+        # key = index of character + 1, 0 for string shorter than i+1 
+        a = ord('a') - 1
+        keys = [ord(s[i]) - a if i < len(s) else 0 for s in sub]
 
         # 1. O(n) count frequencies of items in strs array
-        for s in strs[lo: hi+1]:
-            cnt[indexAt(s)+2] += 1
+        for key in keys:
+            cnt[key+1] += 1
         
-        # 2. O(b) calculate cumulative count
-        cnt = list(accumulate(cnt))  # length of counter array becomes b+2
+        # 2. O(b) calculate cumulative count in place, no new list per call
+        for j in range(1, b+2):
+            cnt[j] += cnt[j-1]
         
         # 3. O(n) output sorted strs to auxiliary array
-        for s in strs[lo: hi+1]:
-            aux[cnt[indexAt(s)+1]] = s  
-            cnt[indexAt(s)+1] += 1 
+        for s, key in zip(sub, keys):
+            aux[cnt[key]] = s  
+            cnt[key] += 1 
 
         # 4. O(n) copy auxiliary array back to original array
         strs[lo:hi+1] = aux[:hi-lo+1]
@@ -146,7 +280,7 @@ class msdRadix:
 
  
     @classmethod
-    def helper(cls, strs: list[str], aux: list[str], lo: int, hi: int, i: int) -> None:
+    def helper(cls, strs: list[str], aux: list[str], counters: list[list[int]], lo: int, hi: int, i: int) -> None:
         """O(n) MSD radix sort of subarray strs[lo..hi] from ith character
         n = hi-lo+1
         i: index of target character (from 0 to d-1)
@@ -160,10 +294,9 @@ class msdRadix:
         if lo >= hi:    # base case: subarray is already sorted.
             return 
         
-        b = 26
-        cnt = cls.countingSort(strs, aux, lo, hi, i)                  # 1. sort array based on the ith character
-        for j in range(b):
-            cls.helper(strs, aux, lo+cnt[j], lo+cnt[j+1]-1, i+1)      # 2. recursively sort subarray in individual bucket based on the i+1 th character
+        cnt = cls.countingSort(strs, aux, counters, lo, hi, i)                  # 1. sort array based on the ith character
+        for j in range(cls.b):
+            cls.helper(strs, aux, counters, lo+cnt[j], lo+cnt[j+1]-1, i+1)      # 2. recursively sort subarray in individual bucket based on the i+1 th character
 
 
     @classmethod 
@@ -191,18 +324,26 @@ class msdRadix:
         """ 
         n = len(strs)
         aux = [''] * n 
-        cls.helper(strs, aux, 0, n-1, 0)
+        # preallocate one counter array per depth, recursion goes at most d+1 levels deep
+        d = max(map(len, strs), default=0)
+        counters = [[0] * (cls.b+2) for _ in range(d+1)]
+        cls.helper(strs, aux, counters, 0, n-1, 0)
 
         assert cls.isSorted(strs, 0, n-1)
 
 
 if __name__ == '__main__':
     print("LSD Radix sort for integers")
-    # r=9679, d=4
+    # r=9679, d=2 (bytes)
     nums = [3221, 1, 10, 9680, 577, 9420, 7, 5622, 4793, 2030, 3138, 82, 2599, 743, 4127]
     print(f"integer array in large range but with few digits = {nums}")
     lsdRadix.sort(nums)
 
+    print("MSD Radix sort for integers (American flag sort)")
+    nums = [3221, 1, 10, 9680, 577, 9420, 7, 5622, 4793, 2030, 3138, 82, 2599, 743, 4127]
+    msdRadixInt.sort(nums)
+    print(f"sorted = {nums}")
+
 
     print("MSD Radix sort for strings")
     # r=26, d=9
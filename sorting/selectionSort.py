@@ -1,8 +1,9 @@
 """
 selection sort
-2 implementations
+3 implementations
 1. min sort
 2. max sort
+3. min-max sort
 """
 class Selection:
     @classmethod
@@ -39,8 +40,7 @@ class Selection:
             
             # Step 2 O(1): swap smallest item with i-th item
             if nums[min_idx] < nums[i]:
-                cls.swap(nums, min_idx, i)
-            assert cls.isSorted(nums, 0, i)
+                nums[min_idx], nums[i] = nums[i], nums[min_idx]
         assert cls.isSorted(nums, 0, N-1)
 
     @classmethod 
@@ -65,8 +65,53 @@ class Selection:
             
             # Step 2 O(1): swap largest item with i-th item
             if nums[max_id] > nums[i]:
-                cls.swap(nums, max_id, i)
-            assert cls.isSorted(nums, i, N-1)
+                nums[max_id], nums[i] = nums[i], nums[max_id]
+        assert cls.isSorted(nums, 0, N-1)
+
+    @classmethod 
+    def MinMaxSort(cls, nums: list[int]) -> None:
+        """ O(N^2) for ALL cases.
+            
+            An array is divided into 3 parts, left part nums[0..i-1] and right part nums[N-i..N-1] are sorted and untouched, 
+            middle part nums[i..N-1-i] is unsorted.
+            For middle part, SELECT both the smallest and the largest item in one pass, 
+            swap the smallest with the first item nums[i] and the largest with the last item nums[N-1-i].
+            Outer loop: O(N) N/2 times, half of MinSort
+            Inner loop: comparison O(N^2)  3N^2/8, 25% fewer than MinSort (Pohl's trick)
+                        items are taken in pairs, the smaller of a pair is only compared with min and the larger only with max,
+                        3 comparisons per 2 items instead of 4
+                        exchange   O(N)    N
+        """
+        N = len(nums)
+        # O(N) pass from both ends of array to the middle
+        # After each pass for i, nums[0..i] and nums[N-1-i..N-1] are sorted
+        for i in range(N//2):
+            hi = N-1-i
+            # Step 1 O(N): for unsorted part, find the index of min and max item in nums[i..hi] 
+            min_idx = max_idx = i
+            if (hi - i) % 2:    # odd number of remaining items after nums[i], compare nums[i+1] alone
+                if nums[i+1] < nums[min_idx]:
+                    min_idx = i+1
+                elif nums[i+1] > nums[max_idx]:
+                    max_idx = i+1
+                start = i+2
+            else:
+                start = i+1
+            for j in range(start, hi, 2):   # pairs (nums[j], nums[j+1])
+                if nums[j+1] < nums[j]:
+                    small, large = j+1, j
+                else:
+                    small, large = j, j+1
+                if nums[small] < nums[min_idx]:
+                    min_idx = small
+                if nums[large] > nums[max_idx]:
+                    max_idx = large
+
+            # Step 2 O(1): swap smallest item with i-th item, largest item with hi-th item
+            nums[min_idx], nums[i] = nums[i], nums[min_idx]
+            if max_idx == i:    # the largest item was just moved from i to min_idx
+                max_idx = min_idx
+            nums[max_idx], nums[hi] = nums[hi], nums[max_idx]
         assert cls.isSorted(nums, 0, N-1)
 
 if __name__ == '__main__':
@@ -76,5 +121,7 @@ if __name__ == '__main__':
     print(f"nums = {nums}")
     Selection.MinSort(nums)
     
-    Selection.MaxSort(nums) 
-     
\ No newline at end of file
+    Selection.MaxSort(nums)
+
+    nums = [9, 8, 7, 6, 5, 4, 3, 2, 1]
+    Selection.MinMaxSort(nums)
@@ -4,23 +4,34 @@ shell sort
 code modified from Java https://algs4.cs.princeton.edu/21elementary/Shell.java.html
 """
 
+from array import array
+from bisect import bisect_left
+from operator import le
+import os
 import random
+
+# per-pass isHsorted checks cost an O(N) scan per gap, run them only when asked for: SHELLSORT_VERIFY=1 python shellSort.py
+_VERIFY = __debug__ and os.environ.get("SHELLSORT_VERIFY", "") not in ("", "0")
+
 class ShellSort:
+    GAPS = [1, 4, 10, 23, 57, 132, 301, 701]    # (Ciura, 2001) empirically best gaps, extended by h = 2.25 * h beyond 701
+    while GAPS[-1] < 2**64:                     # precompute the whole table once, ~50 gaps cover any array length
+        GAPS.append(int(GAPS[-1] * 2.25))
+    CUTOFF = 32     # arrays shorter than CUTOFF are sorted by plain insertion sort, i.e., only the h = 1 pass
+
     @classmethod
     def isSorted(cls, nums: list[int], lo: int, hi: int) -> bool:
-        """Check whether nums[lo..hi] is sorted"""
-        for i in range(lo+1, hi+1):
-            if nums[i] < nums[i-1]:
-                return False 
-        return True
+        """Check whether nums[lo..hi] is sorted
+           adjacent pairs are compared by map() and all() in C instead of a Python loop
+        """
+        return all(map(le, nums[lo: hi], nums[lo+1: hi+1]))
 
     @classmethod
     def isHsorted(cls, nums: list[int], h: int) -> bool:
-        """check whether array is h-sorted"""
-        for i in range(h, len(nums)):
-            if nums[i] < nums[i-h]:
-                return False 
-        return True
+        """check whether array is h-sorted, i.e., nums[i-h] <= nums[i] for all i >= h
+           pairs (nums[i-h], nums[i]) are compared by map() and all() in C instead of a Python loop
+        """
+        return all(map(le, nums, nums[h:]))
 
     @classmethod
     def swap(cls, nums: list[int], i: int, j: int) -> None:
@@ -28,7 +39,15 @@ class ShellSort:
         nums[i], nums[j] = nums[j], nums[i]
 
     @classmethod
-    def sort(cls, nums: list[int]) -> list[int]:
+    def gapSequence(cls, n: int) -> list[int]:
+        """return Ciura's gaps shorter than n from largest to smallest, ending with 1 (empty if n <= 1)
+           O(logN) total: O(1) binary search in the fixed precomputed table, plus O(logN) to copy out the gaps
+        """
+        k = bisect_left(cls.GAPS, n)    # GAPS[0..k-1] < n
+        return cls.GAPS[k-1::-1] if k else []
+
+    @classmethod
+    def sort(cls, nums: list[int], fast: bool=False) -> None:
         """Shell sort
 
             An extension of Insertion Sort.
@@ -38,34 +57,93 @@ class ShellSort:
             gap sequence: any increment sequence of h that starts with 1
             (Knuth, 1973) gap sequence = 1, 4, 13, 40, 121, 364,..., 3*i+1
             worst case O(N^3/2) average case O(N^4/3)  best case O(NlogN)
+            (Ciura, 2001) gap sequence = 1, 4, 10, 23, 57, 132, 301, 701, then 2.25*h   (used)
+            found by experiment, fewer compares on average than Knuth's sequence
         
             Starts from a large value of h, make the array h-sorted, 
                 reducing h by a certian amount, repeat until h is 1. 
             array is h-sorted if all subsequences of every hth item is sorted.
             h is the length of gap in an array.
             h of a sorted array is 1. 
+
+        fast: if True, skip this algorithm and sort with the built-in list.sort() (Timsort written in C).
+              recommended for N > 100_000, where it is far faster than this pure-Python version.
         """
         n = len(nums)
-        # start from a large h
-        h = 1 
-        while h < n / 3:
-            h = 3 * h + 1
-        while h >= 1:
-            # insertion sort to make array h-sorted
+        if fast:
+            if isinstance(nums, array):     # array.array has no sort() method
+                nums[:] = array(nums.typecode, sorted(nums))
+            else:
+                nums.sort()
+            return
+
+        gaps = cls.gapSequence(n)
+        if n < cls.CUTOFF:  # small array: passes of large h move few items, skip them
+            gaps = gaps[-1:]
+        # start from the largest h < n, reduce h to the next smaller gap, repeat until h is 1
+        for h in gaps:
+            # insertion sort (insertion by right shift) to make array h-sorted
+            # larger items are shifted right by h and nums[i] is written once at its position,
+            # one store per move instead of the two of a swap
             for i in range(h, n):
-                # plug nums[i] in nums[h..i-1] if necessary
-                for j in range(i, h-1, -h): # step changes from -1 to -h
-                    if nums[j] < nums[j-h]:
-                        cls.swap(nums, j, j-h)
-                    else:
-                        break 
-            assert cls.isHsorted(nums, h)
-            h //= 3     # reduce h by a certain amount
-        cls.isSorted(nums, 0, n-1)
+                num = nums[i]       # item to be insert into its subsequence nums[i%h], ..., nums[i-h]
+                j = i
+                while j >= h and nums[j-h] > num:   # step changes from -1 to -h
+                    nums[j] = nums[j-h]
+                    j -= h
+                nums[j] = num       # insert item at j
+            if _VERIFY:
+                assert cls.isHsorted(nums, h)
+        assert cls.isSorted(nums, 0, n-1)
+
+    @classmethod
+    def sort_kv(cls, keys: list[int], values: list) -> None:
+        """Shell sort key-value pairs stored in 2 parallel arrays, keys[i] is the key of values[i]
+           keys and values are sorted in place together, by keys only
+
+           keys and values are kept in separate arrays (structure of arrays), 
+           instead of a list of (key, value) tuples (array of structures):
+           compares read only keys, no tuple is unpacked and values are never compared, 
+           values are only moved in lockstep with their keys.
+           values can be anything, e.g., record ids to sort records without moving them.
+
+           raise ValueError if keys and values have different lengths
+        """
+        n = len(keys)
+        if len(values) != n:
+            raise ValueError(f"keys and values must have the same length, got {n} keys and {len(values)} values")
+        for h in cls.gapSequence(n):
+            # insertion sort (insertion by right shift) to make keys h-sorted, shift values with their keys
+            for i in range(h, n):
+                key, value = keys[i], values[i]     # pair to be insert
+                j = i
+                while j >= h and keys[j-h] > key:
+                    keys[j] = keys[j-h]
+                    values[j] = values[j-h]
+                    j -= h
+                keys[j], values[j] = key, value     # insert pair at j
+        assert cls.isSorted(keys, 0, n-1)
+
+    @classmethod
+    def sort_array(cls, nums) -> array:
+        """Shell sort integers in a typed array, return the sorted array
+           nums: array.array (sorted in place) or any iterable of integers (copied into a new array)
+
+           the narrowest type that holds all items is chosen: array('i') of 4-byte items if every item fits in int32, 
+           else array('q') of 8-byte items. 
+           a list stores a pointer per item to an int object of 28+ bytes, so array('i') takes ~8x less memory.
+           reading an item still creates an int object, so in CPython this saves memory, not time.
+        """
+        if not isinstance(nums, array):
+            nums = list(nums)
+            small = not nums or (-2**31 <= min(nums) and max(nums) < 2**31)
+            nums = array('i' if small else 'q', nums)
+        cls.sort(nums)
+        return nums
 
 
 if __name__ == '__main__':
-    print("Shell sort (Knuth, 1973 version)")
+    print("Shell sort (Ciura, 2001 gap sequence)")
     random.seed(123)
     nums = random.sample(range(100), 100)
     print(f"Average case, random input with distinct keys = {nums}")